@@ -1,42 +1,109 @@
 import hashlib
-from datetime import datetime
+from datetime import date, datetime
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich import box
-from rich.prompt import Prompt
 from datetime import timedelta
+from functools import lru_cache
 from getpass import getpass
+import atexit
+import hmac
 import json
 import sqlite3
 import os
 
+try:
+    import ijson
+except ImportError:  # optional, used to stream large JSON imports
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # optional, used for faster JSON exports
+    orjson = None
+
 
 console = Console()
 
+# True only for real YYYY-MM-DD due dates, so malformed values are ignored.
+# The '+0 days' modifier makes SQLite roll impossible days such as 2025-02-30
+# over to the next month, so they no longer compare equal to themselves.
+VALID_DUE_DATE = "date(due_date, '+0 days') = due_date"
+
+# Rows sent to executemany at a time when importing notes
+IMPORT_BATCH_SIZE = 10000
+
+JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson else json.JSONDecodeError
+
+# Notes bound into one multi-row INSERT; 100 rows x 4 columns stays well under
+# SQLite's historical limit of 999 parameters per statement
+NOTES_PER_INSERT = 100
+
+# Above this many rows render_notes_table skips Rich and prints plain lines
+PLAIN_TABLE_THRESHOLD = 500
+
+# Legacy credential store, migrated into the users table on startup
+USERS_FILE = "users.txt"
+
+# Verified against when a username is unknown, so a failed lookup costs as
+# much scrypt work as a wrong password and does not reveal which users exist
+_DUMMY_PW_HASH = "00" * 16 + ":" + "00" * 32
+
+
+_CONN = None
+
 
 def get_connection():
-    """Establish a connection to the SQLite database"""
-    return sqlite3.connect("secondmind.db")
+    """Return the shared SQLite connection, opening it on first use."""
+    global _CONN
+
+    if _CONN is None:
+        _CONN = sqlite3.connect("secondmind.db", check_same_thread=False)
+        _CONN.execute("PRAGMA journal_mode=WAL")
+        _CONN.execute("PRAGMA synchronous=NORMAL")
+        _CONN.execute("PRAGMA temp_store=MEMORY")
+    return _CONN
+
+
+def close_connection():
+    """Close the shared SQLite connection if it has been opened."""
+    global _CONN
+
+    if _CONN is not None:
+        _CONN.close()
+        _CONN = None
+
+
+atexit.register(close_connection)
 
 
 def parse_note(raw_note):
     """Parse a rae note string into its content, tags, and a due date"""
     note_part = raw_note
-    tags = []
     due = None
 
-    if "[due:" in raw_note:
-        note_part, due_chunk = raw_note.rsplit("[due:", 1)
+    head, marker, due_chunk = raw_note.rpartition("[due:")
+    if marker:
+        note_part = head
         due = due_chunk.rstrip("]").strip()
 
-    tag_tokens = [word for word in note_part.strip().split() if word.startswith("#")]
-    tags = tag_tokens
-    clean_note = " ".join(
-        [word for word in note_part.strip().split() if not word.startswith("#")]
-    )
+    tags, words = _partition_tags(note_part)
+
+    return {"note": " ".join(words), "tags": tags, "due_date": due}
+
 
-    return {"note": clean_note.strip(), "tags": tags, "due_date": due}
+def _partition_tags(text):
+    """
+    Split text once and sort each word into '#' tags or plain note words.
+
+    Returns:
+        tuple: (tags, words) as two lists, in their original order.
+    """
+
+    tags = []
+    words = []
+    for word in text.split():
+        # Slicing avoids a method call per word for the one-character prefix
+        (tags if word[:1] == "#" else words).append(word)
+    return tags, words
 
 
 def build_note_from_json(data):
@@ -48,9 +115,114 @@ def build_note_from_json(data):
     return " ".join(part for part in [note, tags, due] if part)
 
 
-def hash_password(password):
-    """Hash a password using SHA256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+def parse_tag_input(raw_tags):
+    """
+    Turn comma-separated tag input into a list of '#'-prefixed tags.
+
+    Args:
+        raw_tags (str): User input such as "todo, #idea".
+
+    Returns:
+        list: Tags such as ["#todo", "#idea"]; blank entries are dropped.
+    """
+
+    tags = []
+    for tag in raw_tags.split(","):
+        name = tag.strip().lstrip("#")
+        if name:
+            tags.append(f"#{name}")
+    return tags
+
+
+def normalize_due_date(due_date):
+    """
+    Zero-pad a due date such as "2025-7-5" to "2025-07-05".
+
+    Due date queries only match the zero-padded form, so dates are
+    normalised before they are stored. Values strptime cannot read are
+    returned unchanged.
+
+    Args:
+        due_date (str): Due date as written in a note, or None.
+
+    Returns:
+        str: The YYYY-MM-DD date, or `due_date` itself if it is not a date.
+    """
+
+    # A parseable 10-character value is already zero-padded; skip strptime
+    if not isinstance(due_date, str) or len(due_date) == 10:
+        return due_date
+    try:
+        return datetime.strptime(due_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return due_date
+
+
+def split_tag_string(tags):
+    """
+    Split a stored tags string into bare tag names.
+
+    Tags may be separated by commas or whitespace and carry a leading '#'.
+
+    Returns:
+        list: Tag names without the '#', e.g. ["work", "urgent"].
+    """
+
+    if not tags:
+        return []
+    names = (word.lstrip("#") for word in tags.replace(",", " ").split())
+    return [name for name in names if name]
+
+
+def _index_note_tags(conn, notes):
+    """
+    Add note_tags rows for the given notes.
+
+    Args:
+        conn: Open database connection or cursor.
+        notes (list): List of (note_id, tags) tuples.
+    """
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO note_tags (note_id, tag) VALUES (?, ?)",
+        [(note_id, tag) for note_id, tags in notes for tag in split_tag_string(tags)],
+    )
+
+
+def hash_password(password, salt=None):
+    """
+    Hash a password with scrypt using a per-user salt.
+
+    Args:
+        password (str): Plain text password.
+        salt (bytes): Optional salt; a random 16-byte salt is used if omitted.
+
+    Returns:
+        str: The salt and derived key as `<salt hex>:<hash hex>`.
+    """
+
+    salt = salt or os.urandom(16)
+    dk = hashlib.scrypt(password.encode(), salt=salt, n=16384, r=8, p=1, dklen=32)
+    return salt.hex() + ":" + dk.hex()
+
+
+def verify_password(password, stored_hash):
+    """
+    Check a password against a stored hash from the users table.
+
+    Unsalted SHA256 digests from the legacy users.txt are still accepted.
+
+    Returns:
+        bool: True if the password matches, False otherwise.
+    """
+
+    if ":" in stored_hash:
+        salt_hex = stored_hash.split(":", 1)[0]
+        candidate = hash_password(password, bytes.fromhex(salt_hex))
+    else:
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+
+    return hmac.compare_digest(candidate, stored_hash)
 
 
 def register_user():
@@ -64,20 +236,18 @@ def register_user():
 
     hashed_pw = hash_password(password)
 
-    # Check if user already exist
-    try:
-        with open("users.txt", "r") as file:
-            for line in file:
-                if line.startswith(username + ":"):
-                    console.print("[bold red]Username already exists.[/bold red]")
-                    return None
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT OR IGNORE INTO users (username, pw_hash) VALUES (?, ?)",
+            (username, hashed_pw),
+        )
+        conn.commit()
 
-    except FileNotFoundError:
-        pass
+    if cursor.rowcount == 0:
+        console.print("[bold red]Username already exists.[/bold red]")
+        return None
 
-    # Save new user
-    with open("users.txt", "a") as file:
-        file.write(f"{username}:{hashed_pw}\n")
     console.print(
         f"User [bold green]'{username}'[/bold green] registered successfully!"
     )
@@ -89,21 +259,25 @@ def login_user():
     """Authenticate a user against stored credentials."""
     username = input("Username: ").strip()
     password = getpass("Password: ").strip()
-    hashed_pw = hash_password(password)
 
-    try:
-        with open("users.txt", "r") as file:
-            for line in file:
-                saved_user, saved_pw = line.strip().split(":")
-                if saved_user == username and saved_pw == hashed_pw:
-                    console.print(
-                        f"[bold green]'{username}'[/bold green] Login successfull!"
-                    )
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pw_hash FROM users WHERE username = ?", (username,))
+        row = cursor.fetchone()
 
-                    return username
+        # Hash the password even for unknown users to keep the timing uniform
+        matched = verify_password(password, row[0] if row else _DUMMY_PW_HASH)
+        if row and matched:
+            # Upgrade legacy SHA256 digests to scrypt on first successful login
+            if ":" not in row[0]:
+                cursor.execute(
+                    "UPDATE users SET pw_hash = ? WHERE username = ?",
+                    (hash_password(password), username),
+                )
+                conn.commit()
 
-    except FileNotFoundError:
-        pass
+            console.print(f"[bold green]'{username}'[/bold green] Login successfull!")
+            return username
 
     console.print("[red]Login failed. Try again[/red]")
     return None
@@ -112,44 +286,255 @@ def login_user():
 user = None
 
 
-def initialize_database():
-    with get_connection() as conn:
-        cursor = conn.cursor()
+def migrate_users_file(conn):
+    """
+    Copy credentials from the legacy users.txt file into the users table.
+
+    Existing usernames are left untouched. Once the import is committed the
+    file is renamed to `<USERS_FILE>.migrated`, so it is only read once.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+    """
+
+    try:
+        with open(USERS_FILE, "r") as file:
+            rows = [
+                tuple(line.strip().split(":", 1)) for line in file if ":" in line
+            ]
+    except FileNotFoundError:
+        return
+
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO users (username, pw_hash) VALUES (?, ?)", rows
+        )
+
+    os.replace(USERS_FILE, f"{USERS_FILE}.migrated")
+
+
+def _create_unique_notes_index(cursor):
+    """
+    Create the index that makes (user, note, tags, due_date) unique.
+
+    Databases created before the index existed may already hold duplicate
+    notes, so those are collapsed onto their oldest copy first.
+    """
+
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uniq_notes'"
+    )
+    if cursor.fetchone():
+        return
+
+    cursor.execute(
+        """
+        DELETE FROM notes WHERE id NOT IN (
+            SELECT MIN(id) FROM notes
+            GROUP BY user, note, IFNULL(tags, ''), IFNULL(due_date, '')
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX uniq_notes
+        ON notes(user, note, IFNULL(tags, ''), IFNULL(due_date, ''))
+    """
+    )
+
+
+def _create_notes_fts(cursor):
+    """
+    Create the notes_fts full-text index over note text and keep it in sync.
+
+    The trigram tokenizer lets `LIKE '%keyword%'` searches use the index.
+    SQLite builds without FTS5 or trigram support skip this, and searches
+    fall back to scanning the notes table.
+    """
+
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notes_fts'"
+    )
+    if cursor.fetchone():
+        return
+
+    try:
         cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user TEXT NOT NULL,
-                note TEXT NOT NULL,
-                tags TEXT,
-                due_date TEXT
+            CREATE VIRTUAL TABLE notes_fts USING fts5(
+                note, content='notes', content_rowid='id', tokenize='trigram'
             )
         """
         )
-        conn.commit()
+    except sqlite3.OperationalError:
+        return
+
+    cursor.execute(
+        """
+        CREATE TRIGGER notes_fts_insert AFTER INSERT ON notes BEGIN
+            INSERT INTO notes_fts(rowid, note) VALUES (new.id, new.note);
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER notes_fts_delete AFTER DELETE ON notes BEGIN
+            INSERT INTO notes_fts(notes_fts, rowid, note)
+            VALUES ('delete', old.id, old.note);
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER notes_fts_update AFTER UPDATE OF note ON notes BEGIN
+            INSERT INTO notes_fts(notes_fts, rowid, note)
+            VALUES ('delete', old.id, old.note);
+            INSERT INTO notes_fts(rowid, note) VALUES (new.id, new.note);
+        END
+    """
+    )
+    # Backfill the index from notes written before it existed
+    cursor.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+
+
+def _create_note_tags(cursor):
+    """
+    Create the note_tags table holding one row per (note, tag) pair.
+
+    Tags are stored without the leading '#' and compared case-insensitively.
+    Existing notes are split into it the first time the table is created.
+    """
+
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'note_tags'"
+    )
+    if cursor.fetchone():
+        return
+
+    cursor.execute(
+        """
+        CREATE TABLE note_tags (
+            note_id INTEGER NOT NULL,
+            tag TEXT NOT NULL COLLATE NOCASE,
+            PRIMARY KEY (note_id, tag)
+        )
+    """
+    )
+    cursor.execute("CREATE INDEX idx_note_tags_tag ON note_tags(tag)")
+    cursor.execute(
+        """
+        CREATE TRIGGER note_tags_delete AFTER DELETE ON notes BEGIN
+            DELETE FROM note_tags WHERE note_id = old.id;
+        END
+    """
+    )
+
+    cursor.execute("SELECT id, tags FROM notes WHERE tags IS NOT NULL")
+    _index_note_tags(cursor, cursor.fetchall())
+
+
+def _normalize_stored_due_dates(cursor):
+    """
+    Zero-pad due dates stored before writes were normalised.
+
+    Older versions saved due dates as typed, e.g. "2025-7-5", which the due
+    date queries no longer match. This runs once per database; PRAGMA
+    user_version records that it has.
+    """
+
+    cursor.execute("PRAGMA user_version")
+    if cursor.fetchone()[0] >= 1:
+        return
+
+    # Anything strptime pads is shorter than the 10-character YYYY-MM-DD form
+    cursor.execute(
+        "SELECT id, due_date FROM notes "
+        "WHERE due_date IS NOT NULL AND length(due_date) < 10"
+    )
+    for note_id, due_date in cursor.fetchall():
+        padded = normalize_due_date(due_date)
+        if padded == due_date:
+            continue
+        try:
+            cursor.execute(
+                "UPDATE notes SET due_date = ? WHERE id = ?", (padded, note_id)
+            )
+        except sqlite3.IntegrityError:
+            # The padded copy of this note already exists, so drop this one
+            cursor.execute("DELETE FROM notes WHERE id = ?", (note_id,))
 
+    cursor.execute("PRAGMA user_version = 1")
 
-initialize_database()
+
+def create_schema(conn):
+    """Create the notes and users tables along with their indexes."""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT NOT NULL,
+            note TEXT NOT NULL,
+            tags TEXT,
+            due_date TEXT
+        )
+    """
+    )
+    # (user, due_date) also serves plain "WHERE user = ?" lookups
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_notes_user_due ON notes(user, due_date)"
+    )
+    _create_unique_notes_index(cursor)
+    _create_notes_fts(cursor)
+    _create_note_tags(cursor)
+    _normalize_stored_due_dates(cursor)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            pw_hash TEXT NOT NULL
+        )
+    """
+    )
+    conn.commit()
+
+
+def initialize_database():
+    with get_connection() as conn:
+        create_schema(conn)
+        migrate_users_file(conn)
 
 
 def render_notes_table(rows, header_style="bold green"):
     """Render a formatting table of notes in the console using Rich.
 
+    Past PLAIN_TABLE_THRESHOLD rows, Rich's per-cell layout dominates, so the
+    notes are printed as plain tab-separated lines instead.
+
     Args:
         rows (list): List of tuples containing note data.
 
         header_style (str): Rich style for the header row.
     """
 
+    from rich.table import Table
+
+    cells = [(str(id_), note, tags or "-", due or "-") for id_, note, tags, due in rows]
+
+    if len(cells) > PLAIN_TABLE_THRESHOLD:
+        lines = ["\t".join(("ID", "Note", "Tags", "Due Date"))]
+        lines.extend("\t".join(row) for row in cells)
+        console.print("\n".join(lines), markup=False, highlight=False)
+        return
+
     table = Table(show_header=True, header_style=header_style)
     table.add_column("ID", style="dim")
     table.add_column("Note", style="cyan")
     table.add_column("Tags", style="yellow")
     table.add_column("Due Date", style="magenta")
 
-    for row in rows:
-        id_, note, tags, due = row
-        table.add_row(str(id_), note, tags or "-", due or "-")
+    for row in cells:
+        table.add_row(*row)
 
     console.print(table)
 
@@ -170,36 +555,105 @@ def add_note_to_db(user, note, tags, due_date, conn=None):
 
     conn = conn or get_connection()
     tag_string = ",".join(tags) if tags else None
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT * FROM notes WHERE user = ? AND note = ? AND tags = ? AND due_date IS?
-    """,
-        (user, note, tag_string, due_date),
-    )
 
-    duplicate = cursor.fetchone()
+    # The uniq_notes index rejects duplicates, so nothing is inserted for them
+    with conn:
+        inserted = _insert_many(conn, [(user, note, tag_string, due_date)])
 
-    if duplicate:
+    if not inserted:
         console.print(
             "[yellow]Note already exists with same content, tags, and due date."
             "Skipping save.[/yellow]"
         )
         return False
 
-    cursor.execute(
-        """
-        INSERT INTO notes (user, note, tags, due_date)
-        VALUES (?, ?, ?, ?)
-    """,
-        (user, note, tag_string, due_date),
-    )
-
-    conn.commit()
     console.print("[green]Note added successfully.[/green]")
     return True
 
 
+@lru_cache(maxsize=None)
+def _insert_notes_sql(count):
+    """Build an INSERT OR IGNORE statement with placeholders for `count` notes."""
+    values = ", ".join(["(?, ?, ?, ?)"] * count)
+    # RETURNING yields only the rows actually inserted, skipping ignored ones
+    return (
+        f"INSERT OR IGNORE INTO notes (user, note, tags, due_date) VALUES {values} "
+        "RETURNING id, tags"
+    )
+
+
+def _insert_many(conn, rows):
+    """
+    Insert several notes using multi-row INSERT statements.
+
+    Packing NOTES_PER_INSERT rows into each statement means SQLite prepares
+    and steps one statement per chunk rather than one per row. The caller
+    owns the transaction and is responsible for committing.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+        rows (list): List of (user, note, tags, due_date) tuples.
+
+    Returns:
+        int: Number of rows inserted; duplicates are silently skipped.
+    """
+
+    inserted = 0
+    for start in range(0, len(rows), NOTES_PER_INSERT):
+        end = start + NOTES_PER_INSERT
+        chunk = rows[start:end]
+        params = [value for row in chunk for value in row]
+        new_notes = conn.execute(_insert_notes_sql(len(chunk)), params).fetchall()
+        _index_note_tags(conn, new_notes)
+        inserted += len(new_notes)
+
+    return inserted
+
+
+def _import_notes(user, candidates):
+    """
+    Bulk insert imported notes for a user, skipping duplicates.
+
+    Rows are inserted in batches of IMPORT_BATCH_SIZE within one transaction,
+    so an error while reading `candidates` rolls back the whole import.
+    Memory is bounded by the batch plus the user's already stored notes,
+    not by the size of the imported file.
+
+    Args:
+        user (str): Username associated with the notes.
+        candidates (iterable): (note, tags, due_date) tuples.
+
+    Returns:
+        int: Number of notes actually inserted.
+    """
+
+    with get_connection() as conn:
+        # Keys are normalised the same way as the uniq_notes index, so notes
+        # already stored are skipped here; repeats within the file itself are
+        # left to INSERT OR IGNORE, which keeps this set from growing with it
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT note, IFNULL(tags, ''), IFNULL(due_date, '') FROM notes "
+            "WHERE user = ?",
+            (user,),
+        )
+        existing = set(cursor.fetchall())
+
+        imported = 0
+        batch = []
+        for note, tags, due_date in candidates:
+            key = (note, tags or "", due_date or "")
+            if key in existing:
+                continue
+            batch.append((user, note, tags, due_date))
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                imported += _insert_many(conn, batch)
+                batch.clear()
+
+        return imported + _insert_many(conn, batch)
+
+
 def view_note_from_db(user):
     """Retrieve and display all notes belonging to a specific user."""
     with get_connection() as conn:
@@ -222,14 +676,21 @@ def delete_note_by_id(user, note_id):
     Args:
         user (str): Username.
         note_id (int): ID of the note to be deleted.
+
+    Returns:
+        bool: True if the note was deleted, False if no such note exists.
     """
 
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM notes WHERE id = ? AND user = ?", (note_id, user))
+        deleted = cursor.rowcount > 0
 
         conn.commit()
+
+    if deleted:
         console.print(f"[green]Deleted note ID {note_id}[/green]")
+    return deleted
 
 
 def import_txt_to_db(user):
@@ -245,36 +706,43 @@ def import_txt_to_db(user):
         console.print("[yellow]No legacy .txt notes found.[/yellow]")
         return
 
-    imported = 0
-    with open(notes_file, "r") as file:
+    candidates = []
+    # A 64KB buffer keeps read() syscalls down on large legacy files
+    with open(notes_file, "r", buffering=65536) as file:
         for line in file:
             line = line.strip()
             if not line:
                 continue
 
-            tags = [word for word in line.split() if word.startswith("#")]
-            note_part = " ".join(
-                [
-                    w
-                    for w in line.split()
-                    if not w.startswith("#") and not w.startswith("[due:")
-                ]
-            )
+            tags, words = _partition_tags(line)
+            note_part = " ".join(w for w in words if w[:5] != "[due:")
+
             due_date = None
             if "[due:" in line:
-                try:
-                    due_date = line.split("[due:")[1].split("]")[0]
-                except (IndexError, ValueError):
-                    due_date = None
+                due_date = normalize_due_date(
+                    line.partition("[due:")[2].partition("]")[0]
+                )
 
-            add_note_to_db(user, note_part.strip(), tags, due_date)
-            imported += 1
+            tag_string = ",".join(tags) if tags else None
+            candidates.append((note_part, tag_string, due_date))
 
+    imported = _import_notes(user, candidates)
     console.print(
         f"[green]Imported {imported} notes from {notes_file} into DB.[/green]"
     )
 
 
+def _json_note_candidates(items):
+    """Yield (note, tags, due_date) tuples from exported JSON note objects."""
+    for item in items:
+        note = item.get("note", "")
+        tags = item.get("tags", [])
+        due = normalize_due_date(item.get("due_date", None))
+        if note:
+            tag_string = ",".join(tags) if tags else None
+            yield (note, tag_string, due)
+
+
 def import_json_to_db(user):
     """
     Import notes from a JSON file into the database for the specified user.
@@ -286,21 +754,16 @@ def import_json_to_db(user):
         console.print("[yellow]No exported JSON found to import.[/yellow]")
         return
 
-    with open(json_file, "r") as f:
+    with open(json_file, "rb") as f:
         try:
-            data = json.load(f)
-        except json.JSONDecodeError:
+            # Stream the notes with ijson when available instead of loading them all
+            items = ijson.items(f, "item") if ijson else json.load(f)
+            imported = _import_notes(user, _json_note_candidates(items))
+        except JSON_ERRORS:
             console.print("[red]Invalid JSON format.[/red]")
             return
 
-    imported = 0
-    for item in data:
-        note = item.get("note", "")
-        tags = item.get("tags", [])
-        due = item.get("due_date", None)
-        if note:
-            add_note_to_db(user, note, tags, due)
-            imported += 1
+    console.print(f"[green]Imported {imported} notes from {json_file} into DB.[/green]")
 
 
 def search_notes_by_keyword(user, keyword):
@@ -313,11 +776,22 @@ def search_notes_by_keyword(user, keyword):
 
     with get_connection() as conn:
         cursor = conn.cursor()
-        query = (
-            "SELECT id, note, tags, due_date FROM notes "
-            "WHERE user = ? AND LOWER(note) LIKE LOWER(?)"
-        )
-        cursor.execute(query, (user, f"%{keyword.lower()}%"))
+        try:
+            # CROSS JOIN pins notes_fts as the outer loop; otherwise the planner
+            # walks the user's notes and re-runs the trigram search per row
+            query = (
+                "SELECT n.id, n.note, n.tags, n.due_date FROM notes_fts "
+                "CROSS JOIN notes n ON n.id = notes_fts.rowid "
+                "WHERE notes_fts.note LIKE ? AND n.user = ? ORDER BY n.id"
+            )
+            cursor.execute(query, (f"%{keyword}%", user))
+        except sqlite3.OperationalError:
+            # No notes_fts table in this database, scan notes instead
+            query = (
+                "SELECT id, note, tags, due_date FROM notes "
+                "WHERE user = ? AND LOWER(note) LIKE LOWER(?)"
+            )
+            cursor.execute(query, (user, f"%{keyword.lower()}%"))
         results = cursor.fetchall()
 
     if results:
@@ -337,9 +811,11 @@ def filter_notes_by_tag(user, tag):
     with get_connection() as conn:
         cursor = conn.cursor()
         query = (
-            "SELECT id, note, tags, due_date FROM notes WHERE user = ? AND tags LIKE ?"
+            "SELECT n.id, n.note, n.tags, n.due_date FROM note_tags t "
+            "JOIN notes n ON n.id = t.note_id "
+            "WHERE t.tag = ? AND n.user = ? ORDER BY n.id"
         )
-        cursor.execute(query, (user, f"%{tag}%"))
+        cursor.execute(query, (tag.strip().lstrip("#"), user))
         results = cursor.fetchall()
 
     if results:
@@ -357,31 +833,30 @@ def view_due_notes(user, mode="today"):
         mode (str): One of "today", "overdue", or "week".
     """
 
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id, note, tags, due_date FROM notes WHERE user = ?", (user,)
-        )
-        results = cursor.fetchall()
-
-    today = datetime.today().date()
+    today = date.today()
     week_later = today + timedelta(days=7)
-    filtered = []
 
-    for row in results:
-        id_, note, tags, due = row
-        if not due:
-            continue
-        try:
-            due_date = datetime.strptime(due, "%Y-%m-%d").date()
-            if mode == "today" and due_date == today:
-                filtered.append(row)
-            elif mode == "overdue" and due_date < today:
-                filtered.append(row)
-            elif mode == "week" and today <= due_date <= week_later:
-                filtered.append(row)
-        except ValueError:
-            continue
+    # YYYY-MM-DD strings sort chronologically, so compare them directly in SQL
+    conditions = {
+        "today": ("due_date = ?", (today.isoformat(),)),
+        "overdue": ("due_date < ?", (today.isoformat(),)),
+        "week": (
+            "due_date BETWEEN ? AND ?",
+            (today.isoformat(), week_later.isoformat()),
+        ),
+    }
+
+    filtered = []
+    if mode in conditions:
+        condition, params = conditions[mode]
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id, note, tags, due_date FROM notes "
+                f"WHERE user = ? AND {condition} AND {VALID_DUE_DATE}",
+                (user, *params),
+            )
+            filtered = cursor.fetchall()
 
     if filtered:
         render_notes_table(filtered, header_style="bold magenta")
@@ -398,6 +873,8 @@ def edit_note_by_id(user, note_id):
         note_id (int): ID of the note to be edited.
     """
 
+    from rich.panel import Panel
+
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
@@ -430,20 +907,27 @@ def edit_note_by_id(user, note_id):
         ).strip()
 
         final_note = new_note if new_note else old_note
-        tag_list = [
-            f"#{tag.strip().lstrip('#')}" for tag in new_tags.split(",") if tag.strip()
-        ]
+        tag_list = parse_tag_input(new_tags)
         final_tags = " ".join(tag_list) if tag_list else (old_tags or "")
-        final_due = new_due if new_due else old_due
+        final_due = normalize_due_date(new_due) if new_due else old_due
 
-        cursor.execute(
-            """
-            UPDATE notes
-            Set note = ?, tags = ?, due_date = ?
-            WHERE id = ? AND user = ?
-        """,
-            (final_note, final_tags, final_due, note_id, user),
-        )
+        try:
+            cursor.execute(
+                """
+                UPDATE notes
+                Set note = ?, tags = ?, due_date = ?
+                WHERE id = ? AND user = ?
+            """,
+                (final_note, final_tags, final_due, note_id, user),
+            )
+            cursor.execute("DELETE FROM note_tags WHERE note_id = ?", (note_id,))
+            _index_note_tags(cursor, [(note_id, final_tags)])
+        except sqlite3.IntegrityError:
+            console.print(
+                "[yellow]Another note already has the same content, tags, and "
+                "due date. Nothing changed.[/yellow]"
+            )
+            return
         conn.commit()
 
         console.print("[green]Note updated successfully[/green]")
@@ -452,35 +936,30 @@ def edit_note_by_id(user, note_id):
 def show_due_alerts_from_db():
     """Display summary of overdue and today's due notes as alerts after login."""
 
-    today = datetime.today().date()
+    from rich.panel import Panel
+
+    today = date.today().isoformat()
 
     with get_connection() as conn:
         cursor = conn.cursor()
+        # Like the per-row loop this replaced, any note with a due date counts
+        # towards the total, but only real dates count as overdue or due today
         cursor.execute(
-            """
-            SELECT due_date FROM notes WHERE user = ? AND due_date IS NOT NULL
+            f"""
+            SELECT COUNT(*),
+                COUNT(*) FILTER (WHERE due_date < ? AND {VALID_DUE_DATE}),
+                COUNT(*) FILTER (WHERE due_date = ? AND {VALID_DUE_DATE})
+            FROM notes
+            WHERE user = ? AND due_date IS NOT NULL
         """,
-            (user,),
+            (today, today, user),
         )
-        results = cursor.fetchall()
-
-    overdue = 0
-    due_today = 0
+        total, overdue, due_today = cursor.fetchone()
 
-    if not results:
+    if not total:
         console.print("[bold yellow]No notes yet![/bold yellow]")
         return
 
-    for (due,) in results:
-        try:
-            due_date = datetime.strptime(due, "%Y-%m-%d").date()
-            if due_date < today:
-                overdue += 1
-            elif due_date == today:
-                due_today += 1
-        except ValueError:
-            continue  # Skip malformed data
-
     if overdue or due_today:
         message = (
             f"[bold red]{overdue} overdue[/bold red] | "
@@ -507,52 +986,38 @@ def export_notes_to_json(user):
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT note, tags, due_date FROM notes WHERE user = ?", (user,))
-        notes = cursor.fetchall()
-
-    data = []
-    for note, tags, due in notes:
-        data.append(
+        data = [
             {"note": note, "tags": tags.split(",") if tags else [], "due_date": due}
-        )
+            for note, tags, due in cursor
+        ]
 
-    with open(f"{user}_notes_export.json", "w") as f:
-        json.dump(data, f, indent=4)
+    if orjson:
+        with open(f"{user}_notes_export.json", "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(f"{user}_notes_export.json", "w") as f:
+            json.dump(data, f, separators=(",", ":"))
 
     console.print(f"[green]Notes exported to {user}_notes_export.json[/green]")
 
 
-def db_note_exists(user, note_id):
-    """
-    Check whether a note with a given ID exists for the user.
-
-    Args:
-        user (str): Username.
-        note_id (int): Note ID to check.
-
-    Returns:
-        bool: True if note exists, False otherwise.
-    """
-
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT 1 FROM notes WHERE id = ? AND user = ?", (note_id, user))
-
-    result = cursor.fetchone()
-
-    conn.close()
-    return result is not None
-
-
 def main():
     """Main entry point for the application.
 
     Handle user login/registration and menu-driven navigation for all note operation
     such as creating, viewing, editing, deleting, importing, and exporting notes.
     """
+    # Rich widgets and the database are only set up once the CLI actually runs
+    from rich import box
+    from rich.panel import Panel
+    from rich.prompt import Prompt
+
     global user
 
     user = None
 
+    initialize_database()
+
     console.print(
         "[bold cyan]Welcome to StarCodersecondMind Secure Notepad[/bold cyan]"
     )
@@ -647,9 +1112,7 @@ def main():
             ).strip()
             due_input = input("Add due date (YYYY-MM-DD) or leave blank: ").strip()
 
-            tag_list = [
-                f"#{tag.strip()}" for tag in your_tags.split(",") if tag.strip()
-            ]
+            tag_list = parse_tag_input(your_tags)
 
             due_date = None
             if due_input:
@@ -699,8 +1162,7 @@ def main():
 
                 if user_input.isdigit():
                     note_id = int(user_input)
-                    if db_note_exists(user, note_id):
-                        delete_note_by_id(user, note_id)
+                    if delete_note_by_id(user, note_id):
                         break
                     else:
                         console.print(f"[red]Not with ID {note_id} not found[/red]")
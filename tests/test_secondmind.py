@@ -1,11 +1,16 @@
 from secondmind.core import (
     parse_note,
+    split_tag_string,
+    parse_tag_input,
+    normalize_due_date,
     get_connection,
     build_note_from_json,
     hash_password,
+    verify_password,
     register_user,
     login_user,
     initialize_database,
+    create_schema,
     add_note_to_db,
     view_note_from_db,
     delete_note_by_id,
@@ -18,35 +23,47 @@ from secondmind.core import (
     edit_note_by_id,
     show_due_alerts_from_db,
     export_notes_to_json,
-    db_note_exists,
+    migrate_users_file,
 )
 
+from contextlib import contextmanager, ExitStack
+from functools import lru_cache
 from unittest.mock import patch, MagicMock, mock_open
+import secondmind.core
+import hashlib
+import io
 import sqlite3
+import subprocess
+import sys
 import json
 import os
+import re
 import pytest
-import tempfile
 from rich.table import Table
 from datetime import datetime, timedelta
 
+# Tests finish well within a day, so the dates can be computed once
+_TODAY = datetime.today().date()
+_TODAY_STR = _TODAY.strftime("%Y-%m-%d")
+_WEEK_LATER_STR = str(_TODAY + timedelta(days=7))
 
-def test_parse_note_with_tags_and_due_date():
-    raw = "Buy milk #grocery #urgent [due:2025-07-25]"
-    note = parse_note(raw)
 
-    assert note["note"] == "Buy milk"
-    assert note["tags"] == ["#grocery", "#urgent"]
-    assert note["due_date"] == "2025-07-25"
-
-
-def parse_note_with_no_tags_or_due():
-    raw = "Read a book"
-    result = parse_note(raw)
-
-    assert result["note"] == "Read a book"
-    assert result["tags"] == []
-    assert result["due_date"] is None
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        (
+            "Buy milk #grocery #urgent [due:2025-07-25]",
+            {
+                "note": "Buy milk",
+                "tags": ["#grocery", "#urgent"],
+                "due_date": "2025-07-25",
+            },
+        ),
+        ("Read a book", {"note": "Read a book", "tags": [], "due_date": None}),
+    ],
+)
+def test_parse_note(raw, expected):
+    assert parse_note(raw) == expected
 
 
 @pytest.mark.parametrize(
@@ -76,26 +93,37 @@ def test_build_note_from_json(data, expected):
 
 
 def test_hash_password_consistency():
+    password = "securePassword123"
+    salt = b"0123456789abcdef"
+    hash1 = hash_password(password, salt)
+    hash2 = hash_password(password, salt)
+    assert hash1 == hash2  # Same input and salt should produce the same hash
+
+
+def test_hash_password_random_salt():
     password = "securePassword123"
     hash1 = hash_password(password)
     hash2 = hash_password(password)
-    assert hash1 == hash2  # Same input should produce the same length
+
+    assert hash1 != hash2  # Each call should pick a fresh salt
 
 
 def test_hash_password_different_inputs():
     password1 = "password123"
     password2 = "differentPassword456"
-    hash1 = hash_password(password1)
-    hash2 = hash_password(password2)
+    salt = b"0123456789abcdef"
+    hash1 = hash_password(password1, salt)
+    hash2 = hash_password(password2, salt)
 
     assert hash1 != hash2  # Different passwords should not produce the same hash
 
 
 def test_hash_password_length():
     password = "testpassword"
-    hashed = hash_password(password)
+    salt_hex, dk_hex = hash_password(password).split(":")
 
-    assert len(hashed) == 64  # SHA256 produces a 64-character hex string
+    assert len(salt_hex) == 32  # 16-byte salt as hex
+    assert len(dk_hex) == 64  # 32-byte scrypt key as hex
 
 
 def test_hash_password_empty():
@@ -103,34 +131,65 @@ def test_hash_password_empty():
     hashed = hash_password(password)
 
     assert (
-        len(hashed) == 64
-    )  # Hashing in empty string should still return a valid 64-char hash
+        len(hashed) == 97
+    )  # Hashing in empty string should still return a valid salt:hash pair
 
     assert len(hashed) != "empty"  # Ensure it's not just returning the string "empty"
 
 
-@patch("builtins.input", return_value="testuser")
-@patch("secondmind.core.getpass", return_value="securePassword123")
-@patch("secondmind.core.console.print")
-@patch(
-    "builtins.open", new_callable=mock_open, read_data=""
-)  # Mocking open with empty file
-def test_register_user_success(mock_file, mock_print, mock_getpass, mock_input):
-    # Act
-    username = register_user()
+@lru_cache(maxsize=128)
+def stored_hash(password):
+    """Hash a test password once; scrypt is deliberately slow to compute."""
+    return hash_password(password)
 
-    # Assert username is returned correctly
-    assert username == "testuser"
 
-    # Assert the correct file operations
-    mock_file.assert_any_call("users.txt", "a")
-    mock_file.assert_any_call("users.txt", "r")
+def test_verify_password():
+    stored = stored_hash("securePassword123")
+
+    assert verify_password("securePassword123", stored) is True
+    assert verify_password("wrongpassword", stored) is False
+
+
+def test_verify_password_legacy_sha256():
+    stored = hashlib.sha256(b"securePassword123").hexdigest()
+
+    assert verify_password("securePassword123", stored) is True
+    assert verify_password("wrongpassword", stored) is False
+
 
-    handle = mock_file()
+@contextmanager
+def auth_prompts(username, password):
+    """Answer the username/password prompts and capture console output."""
+    with ExitStack() as stack:
+        stack.enter_context(patch("builtins.input", return_value=username))
+        stack.enter_context(patch("secondmind.core.getpass", return_value=password))
+        yield stack.enter_context(patch("secondmind.core.console.print"))
 
-    handle.write.assert_called_once_with(
-        f"testuser:{hash_password('securePassword123')}\n"
+
+def add_test_user(conn, username, password):
+    conn.execute(
+        "INSERT INTO users (username, pw_hash) VALUES (?, ?)",
+        (username, stored_hash(password)),
     )
+    conn.commit()
+
+
+def test_register_user_success(temp_db):
+    conn = temp_db
+
+    with auth_prompts("testuser", "securePassword123") as mock_print, patch(
+        "secondmind.core.get_connection", return_value=conn
+    ):
+        # Act
+        username = register_user()
+
+    # Assert username is returned correctly
+    assert username == "testuser"
+
+    # Assert the credentials were stored
+    cursor = conn.cursor()
+    cursor.execute("SELECT pw_hash FROM users WHERE username = ?", ("testuser",))
+    assert verify_password("securePassword123", cursor.fetchone()[0])
 
     # Assert correct console output
     mock_print.assert_called_once_with(
@@ -138,12 +197,10 @@ def test_register_user_success(mock_file, mock_print, mock_getpass, mock_input):
     )
 
 
-@patch("builtins.input", return_value="")
-@patch("secondmind.core.getpass", return_value="securePassword123")
-@patch("secondmind.core.console.print")
-def test_register_user_empty_username(mock_print, mock_getpass, mock_input):
-    # Act
-    username = register_user()
+def test_register_user_empty_username():
+    with auth_prompts("", "securePassword123") as mock_print:
+        # Act
+        username = register_user()
 
     # Assert no username is returned
     assert username is None
@@ -154,13 +211,15 @@ def test_register_user_empty_username(mock_print, mock_getpass, mock_input):
     )
 
 
-@patch("builtins.input", return_value="testuser")
-@patch("secondmind.core.getpass", return_value="securePassword123")
-@patch("secondmind.core.console.print")
-@patch("builtins.open", new_callable=mock_open, read_data="testuser:hashed_pw\n")
-def test_register_user_exists(mock_file, mock_print, mock_getpass, mock_input):
-    # Act
-    username = register_user()
+def test_register_user_exists(temp_db):
+    conn = temp_db
+    add_test_user(conn, "testuser", "otherPassword")
+
+    with auth_prompts("testuser", "securePassword123") as mock_print, patch(
+        "secondmind.core.get_connection", return_value=conn
+    ):
+        # Act
+        username = register_user()
 
     # Assert no new user is created
     assert username is None
@@ -169,102 +228,169 @@ def test_register_user_exists(mock_file, mock_print, mock_getpass, mock_input):
     mock_print.assert_called_once_with("[bold red]Username already exists.[/bold red]")
 
 
-@patch("builtins.input", return_value="newuser")
-@patch("secondmind.core.getpass", return_value="newPassword123")
-@patch("secondmind.core.console.print")
-def test_register_user_file_not_found(mock_print, mock_getpass, mock_input):
-    mocked_open = mock_open()
-    open_call_tracker = MagicMock()
+def test_migrate_users_file(tmp_path, temp_db, monkeypatch):
+    users_file = tmp_path / "users.txt"
+    users_file.write_text("olduser:legacyhash\ntestuser:otherlegacyhash\n")
+    monkeypatch.setattr("secondmind.core.USERS_FILE", str(users_file))
 
-    # Custom side effect to stimulate FileNotFoundError on first read.
-    # then return mock handle for writing - while tracking all calls
-    def open_side_effect(file, mode, *args, **kwargs):
-        open_call_tracker(file, mode)  # record the call manually
-        if mode == "r":
-            raise FileNotFoundError()
-        return mocked_open.return_value
+    conn = temp_db
+    conn.execute(
+        "INSERT INTO users (username, pw_hash) VALUES (?, ?)",
+        ("testuser", "currenthash"),
+    )
+    conn.commit()
 
-    with patch("builtins.open", side_effect=open_side_effect):
-        username = register_user()
+    # Act
+    migrate_users_file(conn)
 
-        # Assert username is returned correctly
-        assert username == "newuser"
+    # Assert legacy users are imported without overwriting existing ones
+    cursor = conn.cursor()
+    cursor.execute("SELECT username, pw_hash FROM users ORDER BY username")
+    assert cursor.fetchall() == [
+        ("olduser", "legacyhash"),
+        ("testuser", "currenthash"),
+    ]
 
-        open_call_tracker.assert_any_call("users.txt", "a")
+    # The file is retired so the next start does not import it again
+    assert not users_file.exists()
+    assert (tmp_path / "users.txt.migrated").exists()
 
-        # Ensure content was written
-        handle = mocked_open()
 
-        handle.write.assert_called_once_with(
-            f"newuser:{hash_password('newPassword123')}\n"
-        )
+def fake_open(data):
+    """Return an open() replacement that serves `data` from memory."""
+    return lambda *args, **kwargs: io.StringIO(data)
 
-        # Assert correct console output
-        mock_print.assert_called_once_with(
-            "User [bold green]'newuser'[/bold green] registered successfully!"
-        )
 
+def test_migrate_users_file_many_users(temp_db, monkeypatch):
+    lines = [f"user{i}:hash{i}" for i in range(1000)]
+    monkeypatch.setattr(
+        "secondmind.core.open",
+        fake_open("\n".join(lines) + "\nnot a user\n"),
+        raising=False,
+    )
+    # There is no file on disk to retire
+    monkeypatch.setattr("secondmind.core.os.replace", MagicMock())
 
-@patch("builtins.input", return_value="testuser")
-@patch("secondmind.core.getpass", return_value="securePassword123")
-@patch("secondmind.core.console.print")
-@patch(
-    "builtins.open",
-    new_callable=mock_open,
-    read_data="testuser:" + hash_password("securePassword123") + "\n",
-)
-def test_login_user_success(mock_file, mock_print, mock_getpass, mock_input):
-    # ACt
-    username = login_user()
+    conn = temp_db
 
-    # Assert login succeeded
-    assert username == "testuser"
+    # Act
+    migrate_users_file(conn)
 
-    # Assert console outptu
+    # Assert every well-formed line was imported and the rest skipped
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*), MAX(pw_hash) FROM users")
+    assert cursor.fetchone() == (1000, "hash999")
 
-    mock_print.assert_called_once_with(
-        "[bold green]'testuser'[/bold green] Login successfull!"
-    )
 
+def test_migrate_users_file_not_found(tmp_path, temp_db, monkeypatch):
+    monkeypatch.setattr("secondmind.core.USERS_FILE", str(tmp_path / "users.txt"))
+
+    conn = temp_db
 
-@patch("builtins.input", return_value="testuser")
-@patch("secondmind.core.getpass", return_value="wrongpassword")
-@patch("secondmind.core.console.print")
-@patch(
-    "builtins.open",
-    new_callable=mock_open,
-    read_data="testuser:" + hash_password("correctpassword") + "\n",
-)
-def test_login_user_incorrect_password(mock_file, mock_print, mock_getpass, mock_input):
     # Act
-    username = login_user()
+    migrate_users_file(conn)
+
+    # Assert nothing was imported
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM users")
+    assert cursor.fetchone()[0] == 0
+
 
-    # Assert login failed
+@pytest.mark.parametrize(
+    "stored_pw, entered_pw, expected_user, expected_message",
+    [
+        (
+            "securePassword123",
+            "securePassword123",
+            "testuser",
+            "[bold green]'testuser'[/bold green] Login successfull!",
+        ),
+        (
+            "correctpassword",
+            "wrongpassword",
+            None,
+            "[red]Login failed. Try again[/red]",
+        ),
+        (None, "somepassword", None, "[red]Login failed. Try again[/red]"),
+    ],
+    ids=["success", "incorrect_password", "unknown_user"],
+)
+def test_login_user(temp_db, stored_pw, entered_pw, expected_user, expected_message):
+    conn = temp_db
+    if stored_pw is not None:
+        add_test_user(conn, "testuser", stored_pw)
+
+    with auth_prompts("testuser", entered_pw) as mock_print, patch(
+        "secondmind.core.get_connection", return_value=conn
+    ):
+        # Act
+        username = login_user()
+
+    # Assert the login outcome and the message shown
+    assert username == expected_user
+    mock_print.assert_called_once_with(expected_message)
+
+
+def test_login_user_unknown_user_still_hashes(temp_db):
+    conn = temp_db
+
+    with auth_prompts("nobody", "somepassword"), patch(
+        "secondmind.core.get_connection", return_value=conn
+    ), patch(
+        "secondmind.core.verify_password", wraps=verify_password
+    ) as mock_verify:
+        # Act
+        username = login_user()
+
+    # Assert the password is still run through scrypt
     assert username is None
+    mock_verify.assert_called_once_with(
+        "somepassword", secondmind.core._DUMMY_PW_HASH
+    )
 
-    # Assert error message shown
-    mock_print.assert_called_once_with("[red]Login failed. Try again[/red]")
 
+def test_login_user_after_users_file_migration(tmp_path, temp_db, monkeypatch):
+    users_file = tmp_path / "users.txt"
+    users_file.write_text(f"testuser:{stored_hash('securePassword123')}\n")
+    monkeypatch.setattr("secondmind.core.USERS_FILE", str(users_file))
 
-@patch("builtins.input", return_value="testuser")
-@patch("secondmind.core.getpass", return_value="somepassword")
-@patch("secondmind.core.console.print")
-@patch("builtins.open", side_effect=FileNotFoundError)
-def test_login_user_filel_not_found(mock_file, mock_print, mock_getpass, mock_input):
-    # Act
-    username = login_user()
+    conn = temp_db
+    migrate_users_file(conn)
 
-    # Assert login failed
-    assert username is None
+    with auth_prompts("testuser", "securePassword123"), patch(
+        "secondmind.core.get_connection", return_value=conn
+    ):
+        # Act
+        username = login_user()
 
-    # Assert error message shown
-    mock_print.assert_called_once_with("[red]Login failed. Try again[/red]")
+    # Assert the migrated credentials are accepted
+    assert username == "testuser"
 
 
-def test_initialize_database_create_table():
-    # Act
-    initialize_database()
+def test_login_user_upgrades_legacy_hash(temp_db):
+    conn = temp_db
+    conn.execute(
+        "INSERT INTO users (username, pw_hash) VALUES (?, ?)",
+        ("testuser", hashlib.sha256(b"securePassword123").hexdigest()),
+    )
+    conn.commit()
+
+    with auth_prompts("testuser", "securePassword123"), patch(
+        "secondmind.core.get_connection", return_value=conn
+    ):
+        # Act
+        username = login_user()
+
+    # Assert login succeeded and the stored hash is now salted scrypt
+    assert username == "testuser"
+    cursor = conn.cursor()
+    cursor.execute("SELECT pw_hash FROM users WHERE username = ?", ("testuser",))
+    stored = cursor.fetchone()[0]
+    assert ":" in stored
+    assert verify_password("securePassword123", stored)
+
 
+def test_initialize_database_create_table():
     # Assert the table exists
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -276,28 +402,86 @@ def test_initialize_database_create_table():
         assert table[0] == "notes"
 
 
+def test_import_has_no_side_effects(tmp_path):
+    # Importing the module must not create the database or load Rich widgets
+    code = (
+        "import sys, secondmind.core; "
+        "assert 'rich.table' not in sys.modules; "
+        "assert 'rich.prompt' not in sys.modules"
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(__file__)))
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+
+    assert not (tmp_path / "secondmind.db").exists()
+
+
+def test_get_connection_is_reused():
+    first = get_connection()
+    second = get_connection()
+
+    assert first is second
+
+
 def test_initialize_database_idempotent():
-    initialize_database()
+    # _init_db already ran it once; a second run must not fail
     initialize_database()
 
 
-def test_notes_table_schema():
-    initialize_database()
+@pytest.fixture(scope="session")
+def notes_columns(app_db):
+    """Column names of the notes table, read once per session."""
+    cursor = app_db.execute("PRAGMA table_info(notes)")
+    return tuple(col[1] for col in cursor.fetchall())
+
+
+def test_notes_table_schema(notes_columns):
+    assert notes_columns == ("id", "user", "note", "tags", "due_date")
+
+
+def test_notes_indexes_created():
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("PRAGMA table_info(notes)")
-        columns = [col[1] for col in cursor.fetchall()]
-        expected_columns = ["id", "user", "note", "tags", "due_date"]
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='notes'"
+        )
+        indexes = {row[0] for row in cursor.fetchall()}
+
+        assert {"idx_notes_user_due", "uniq_notes"} <= indexes
 
-        assert columns == expected_columns
 
+def get_test_db_conn(image=None):
+    conn = sqlite3.connect(":memory:")
+    if image is not None:
+        conn.deserialize(image)
+    return conn
+
+
+def seed_notes(conn, rows):
+    """
+    Bulk insert (user, note, tags, due_date) rows and index their tags.
+
+    One multi-row INSERT ... RETURNING is used rather than executemany, which
+    cannot hand back rows, so tests get the new IDs without another query.
+
+    Returns:
+        list: IDs of the seeded notes, in the order of `rows`.
+    """
+    values = ", ".join(["(?, ?, ?, ?)"] * len(rows))
+    with conn:
+        cursor = conn.execute(
+            f"INSERT INTO notes (user, note, tags, due_date) VALUES {values} "
+            "RETURNING id, tags",
+            [value for row in rows for value in row],
+        )
+        # AUTOINCREMENT ids follow insertion order, whatever order RETURNING uses
+        notes = sorted(cursor.fetchall())
+        secondmind.core._index_note_tags(conn, notes)
 
-def get_test_db_conn(db_path):
-    return sqlite3.connect(db_path)
+    return [note_id for note_id, _ in notes]
 
 
 def test_add_unique_note(temp_db):
-    conn = get_test_db_conn(temp_db)
+    conn = temp_db
     with patch("secondmind.core.get_connection", return_value=conn):
         user = "testuser"
         note = "This is a unique test note"
@@ -306,7 +490,7 @@ def test_add_unique_note(temp_db):
 
 
 def test_add_duplicate_note(temp_db):
-    conn = get_test_db_conn(temp_db)
+    conn = temp_db
     with patch("secondmind.core.get_connection", return_value=conn):
         user = "testuser"
         note = "Duplicate note here"
@@ -320,36 +504,139 @@ def test_add_duplicate_note(temp_db):
         assert second is False
 
 
-@pytest.fixture
-def temp_db():
-    db_fd, db_path = tempfile.mkstemp(suffix=".db")
-    conn = get_test_db_conn(db_path)
+def test_add_duplicate_note_without_tags_or_due(temp_db):
+    conn = temp_db
+    with patch("secondmind.core.get_connection", return_value=conn):
+        first = add_note_to_db("testuser", "Plain note", [], None)
+        second = add_note_to_db("testuser", "Plain note", [], None)
+
+        assert first is True
+        assert second is False
+
+
+def test_initialize_database_collapses_duplicates(tmp_path, monkeypatch):
+    monkeypatch.setattr("secondmind.core.USERS_FILE", str(tmp_path / "users.txt"))
+    conn = sqlite3.connect(tmp_path / "legacy.db")
+    conn.execute(
+        """
+        CREATE TABLE notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT NOT NULL,
+            note TEXT NOT NULL,
+            tags TEXT,
+            due_date TEXT
+        )
+    """
+    )
+    conn.executemany(
+        "INSERT INTO notes (user, note, tags, due_date) VALUES (?, ?, ?, ?)",
+        [
+            ("testuser", "Same note", None, None),
+            ("testuser", "Same note", None, None),
+            ("testuser", "Other note", "#tag", "2025-08-01"),
+        ],
+    )
+    conn.commit()
+
+    with patch("secondmind.core.get_connection", return_value=conn):
+        initialize_database()
 
     cursor = conn.cursor()
-    cursor.execute(
+    cursor.execute("SELECT id, note FROM notes ORDER BY id")
+    assert cursor.fetchall() == [(1, "Same note"), (3, "Other note")]
+
+    # Existing tags are split into note_tags
+    cursor.execute("SELECT note_id, tag FROM note_tags")
+    assert cursor.fetchall() == [(3, "tag")]
+    conn.close()
+
+
+def test_create_schema_pads_stored_due_dates(tmp_path):
+    conn = sqlite3.connect(tmp_path / "legacy.db")
+    conn.execute(
         """
-        CREATE TABLE IF NOT EXISTS notes (
+        CREATE TABLE notes (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user TEXT,
-            note TEXT,
+            user TEXT NOT NULL,
+            note TEXT NOT NULL,
             tags TEXT,
             due_date TEXT
         )
     """
     )
+    conn.executemany(
+        "INSERT INTO notes (user, note, tags, due_date) VALUES (?, ?, ?, ?)",
+        [
+            ("testuser", "Pay rent", None, "2025-7-5"),
+            ("testuser", "Call mum", None, "2025-08-01"),
+            ("testuser", "Call mum", None, "2025-8-1"),  # same note once padded
+            ("testuser", "Someday", None, "someday"),
+        ],
+    )
     conn.commit()
 
-    yield db_path
+    create_schema(conn)
 
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, due_date FROM notes ORDER BY id")
+    assert cursor.fetchall() == [(1, "2025-07-05"), (2, "2025-08-01"), (4, "someday")]
+
+    # The migration is recorded so later starts skip it
+    cursor.execute("PRAGMA user_version")
+    assert cursor.fetchone()[0] == 1
     conn.close()
-    os.close(db_fd)
-    os.remove(db_path)
 
 
-def test_view_note_with_notes(temp_db, monkeypatch):
-    os.environ["SECOND_MIND_DB"] = str(temp_db)
+@pytest.fixture(scope="session", autouse=True)
+def app_db(tmp_path_factory):
+    """
+    Point the app's shared connection at a private in-memory database.
+
+    Tests that call get_connection() unpatched would otherwise share
+    secondmind.db in the working directory, which is not safe when the
+    suite runs across several pytest-xdist workers. USERS_FILE is moved
+    out of the working directory for the same reason, so
+    initialize_database() never migrates a real users.txt.
+    """
+    users_file = tmp_path_factory.mktemp("legacy") / "users.txt"
+    conn = get_test_db_conn()
+    with patch("secondmind.core._CONN", conn), patch(
+        "secondmind.core.USERS_FILE", str(users_file)
+    ):
+        yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _init_db(app_db):
+    """Initialize the app database once instead of in every schema test."""
+    initialize_database()
+
+
+@pytest.fixture(scope="session")
+def schema_image():
+    """Build the schema once in memory and serialize it for cloning."""
+    template = get_test_db_conn()
+    create_schema(template)
+    image = template.serialize()
+    template.close()
+
+    return image
+
+
+@pytest.fixture
+def temp_db(schema_image):
+    """Clone the schema into a fresh in-memory database for one test."""
+    conn = get_test_db_conn(schema_image)
+
+    yield conn
+
+    conn.close()
+
+
+def test_view_note_with_notes(temp_db):
+    conn = temp_db
 
-    conn = get_test_db_conn(temp_db)
     # Add note to DB using real function
     with patch("secondmind.core.get_connection", return_value=conn):
         add_note_to_db("testuser", "Sample note", ["#test"], "2025-08-01")
@@ -360,10 +647,9 @@ def test_view_note_with_notes(temp_db, monkeypatch):
             mock_render.assert_called_once()  # Should render
 
 
-def test_view_note_empty(temp_db, monkeypatch):
-    os.environ["SECOND_MIND_DB"] = str(temp_db)
+def test_view_note_empty(temp_db):
+    conn = temp_db
 
-    conn = get_test_db_conn(temp_db)
     with patch("secondmind.core.get_connection", return_value=conn):
         # No notes added
 
@@ -380,9 +666,9 @@ def test_delete_note_success(temp_db):
     tags = "#test"
     due_date = "2025-07-25"
 
-    with get_test_db_conn(temp_db) as conn:
+    conn = temp_db
+    with conn:
         with patch("secondmind.core.get_connection", return_value=conn):
-            add_note_to_db(user, note, tags.split(","), due_date)
             # insert a test note directly
             cursor = conn.cursor()
             cursor.execute(
@@ -394,7 +680,7 @@ def test_delete_note_success(temp_db):
 
             # Now test deletion
             with patch("secondmind.core.console.print") as mock_print:
-                delete_note_by_id(user, note_id)
+                assert delete_note_by_id(user, note_id) is True
                 mock_print.assert_called_once_with(
                     f"[green]Deleted note ID {note_id}[/green]"
                 )
@@ -410,15 +696,32 @@ def test_delete_note_invalid_id(temp_db):
     user = "testuser"
     invalid_note_id = 9999
 
-    with get_test_db_conn(temp_db) as conn:
+    conn = temp_db
+    with conn:
         with patch("secondmind.core.get_connection", return_value=conn):
             with patch("secondmind.core.console.print") as mock_print:
-                delete_note_by_id(user, invalid_note_id)
+                deleted = delete_note_by_id(user, invalid_note_id)
+
+            # Verify nothing was reported as deleted
+            assert deleted is False
+            mock_print.assert_not_called()
 
-            # Verify the error message was shown
-            mock_print.assert_called_once_with(
-                f"[green]Deleted note ID {invalid_note_id}[/green]"
-            )
+
+def test_delete_note_other_users_note(temp_db):
+    """Test that a user cannot delete another user's note"""
+
+    conn = temp_db
+    with conn:
+        with patch("secondmind.core.get_connection", return_value=conn):
+            with patch("secondmind.core.console.print"):
+                add_note_to_db("owner", "Private note", [], None)
+                note_id = conn.execute("SELECT id FROM notes").fetchone()[0]
+
+                assert delete_note_by_id("intruder", note_id) is False
+
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM notes WHERE id = ?", (note_id,))
+            assert cursor.fetchone()[0] == 1
 
 
 def test_render_notes_table_renders_correctly():
@@ -446,7 +749,23 @@ def test_render_notes_table_renders_correctly():
         assert printed_table.columns[3].header == "Due Date"
 
 
-def test_import_txt_to_db(tmp_path):
+def test_render_notes_table_plain_for_many_rows():
+    sample_data = [(i, f"Note {i}", None, None) for i in range(501)]
+
+    with patch("secondmind.core.console.print") as mock_print:
+        render_notes_table(sample_data)
+
+        mock_print.assert_called_once()
+
+        printed = mock_print.call_args[0][0]
+        lines = printed.split("\n")
+
+        assert lines[0] == "ID\tNote\tTags\tDue Date"
+        assert lines[1] == "0\tNote 0\t-\t-"
+        assert len(lines) == 502
+
+
+def test_import_txt_to_db(tmp_path, temp_db, monkeypatch):
     # Setup
     username = "testuser"
     filename = tmp_path / f"notes_{username}.txt"
@@ -456,19 +775,24 @@ def test_import_txt_to_db(tmp_path):
     """
     filename.write_text(content)
 
-    # Patch cwd so function looks in tmp_path
-    with patch("secondmind.core.os.path.exists", return_value=True), patch(
-        "secondmind.core.open", side_effect=lambda *a, **k: open(filename, *a[1:], **k)
-    ), patch("secondmind.core.add_note_to_db") as mock_add, patch(
+    conn = temp_db
+
+    # Run from tmp_path so the import finds the file
+    monkeypatch.chdir(tmp_path)
+
+    with patch("secondmind.core.get_connection", return_value=conn), patch(
         "secondmind.core.console.print"
     ) as mock_print:
         import_txt_to_db(username)
 
-        # Check add_note_to_db called correct number of times
-        assert mock_add.call_count == 3
-
-        # Optionally check one specific call
-        mock_add.assert_any_call(username, "Buy groceries", ["#errand"], "2025-07-31")
+        # Check every line was inserted
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT note, tags, due_date FROM notes WHERE user = ?", (username,)
+        )
+        rows = cursor.fetchall()
+        assert len(rows) == 3
+        assert ("Buy groceries", "#errand", "2025-07-31") in rows
 
         # Print message should contain import
         mock_print.assert_called_with(
@@ -476,7 +800,67 @@ def test_import_txt_to_db(tmp_path):
         )
 
 
-def test_import_json_to_db(tmp_path):
+def test_import_txt_to_db_pads_due_dates(tmp_path, temp_db, monkeypatch):
+    username = "testuser"
+    filename = tmp_path / f"notes_{username}.txt"
+    filename.write_text("Pay rent [due:2025-7-5]\nCall mum [due:someday]\n")
+
+    conn = temp_db
+    monkeypatch.chdir(tmp_path)
+
+    with patch("secondmind.core.get_connection", return_value=conn), patch(
+        "secondmind.core.console.print"
+    ):
+        import_txt_to_db(username)
+
+    # Un-padded dates are stored in the form the due date queries match
+    cursor = conn.cursor()
+    cursor.execute("SELECT note, due_date FROM notes ORDER BY id")
+    assert cursor.fetchall() == [("Pay rent", "2025-07-05"), ("Call mum", "someday")]
+
+
+def test_import_txt_to_db_skips_duplicates(tmp_path, temp_db, monkeypatch):
+    username = "testuser"
+    filename = tmp_path / f"notes_{username}.txt"
+    content = """Buy groceries #errand [due:2025-07-31]
+        Buy groceries #errand [due:2025-07-31]
+        Clean the house #chores
+        Walk the dog
+    """
+    filename.write_text(content)
+
+    conn = temp_db
+    # Edited notes without tags are stored with an empty string, not NULL
+    conn.execute(
+        "INSERT INTO notes (user, note, tags, due_date) VALUES (?, ?, ?, ?)",
+        (username, "Walk the dog", "", None),
+    )
+    conn.commit()
+
+    monkeypatch.chdir(tmp_path)
+
+    with patch("secondmind.core.get_connection", return_value=conn), patch(
+        "secondmind.core.console.print"
+    ) as mock_print:
+        add_note_to_db(username, "Clean the house", ["#chores"], None)
+        import_txt_to_db(username)
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM notes WHERE user = ?", (username,))
+        assert cursor.fetchone()[0] == 3
+
+        # Only the one genuinely new note is reported
+        mock_print.assert_called_with(
+            f"[green]Imported 1 notes from notes_{username}.txt into DB.[/green]"
+        )
+
+        # Notes already stored are filtered out before they ever reach INSERT
+        with patch("secondmind.core._insert_many", return_value=0) as mock_insert:
+            import_txt_to_db(username)
+            mock_insert.assert_called_once_with(conn, [])
+
+
+def test_import_json_to_db(tmp_path, temp_db, monkeypatch):
     # Arrange
     user = "testuser"
     filename = tmp_path / f"{user}_notes_export.json"
@@ -487,36 +871,96 @@ def test_import_json_to_db(tmp_path):
     ]
     filename.write_text(json.dumps(notes_data))
 
-    # Patch os.path.exists + open + add_note_to_db
-    with patch("secondmind.core.os.path.exists", return_value=True), patch(
-        "secondmind.core.open", side_effect=lambda *a, **k: open(filename, *a[1:], **k)
-    ), patch("secondmind.core.add_note_to_db") as mock_add, patch(
+    conn = temp_db
+
+    # Run from tmp_path so the import finds the file
+    monkeypatch.chdir(tmp_path)
+
+    with patch("secondmind.core.get_connection", return_value=conn), patch(
         "secondmind.core.console.print"
     ) as mock_print:
 
         import_json_to_db(user)
 
-        # Assert: Called once for each note
-        assert mock_add.call_count == 3
-        mock_add.assert_any_call(user, "Note 1", ["#tag"], "2025-08-01")
-        mock_add.assert_any_call(user, "Note 2", [], None)
+        # Assert: One row for each note
+        cursor = conn.cursor()
+        cursor.execute("SELECT note, tags, due_date FROM notes WHERE user = ?", (user,))
+        rows = cursor.fetchall()
+        assert len(rows) == 3
+        assert ("Note 1", "#tag", "2025-08-01") in rows
+        assert ("Note 2", None, None) in rows
 
         # Final print confirmation
-        mock_print.assert_not_called()  # No warning/error, only silent success
+        mock_print.assert_called_once_with(
+            f"[green]Imported 3 notes from {user}_notes_export.json into DB.[/green]"
+        )
 
 
-def test_import_json_to_db_invalid_json(tmp_path):
+@pytest.mark.parametrize("use_ijson", [True, False])
+def test_import_json_to_db_batches(tmp_path, temp_db, monkeypatch, use_ijson):
     user = "testuser"
     filename = tmp_path / f"{user}_notes_export.json"
-    filename.write_text("This is not valid JSON")
+    # 250 notes span several multi-row INSERT chunks and import batches
+    notes_data = [
+        {"note": f"Note {i}", "tags": [f"#t{i % 3}"], "due_date": None}
+        for i in range(250)
+    ]
+    filename.write_text(json.dumps(notes_data))
 
-    with patch("secondmind.core.os.path.exists", return_value=True), patch(
-        "secondmind.core.open", side_effect=lambda *a, **k: open(filename, *a[1:], **k)
-    ), patch("secondmind.core.console.print") as mock_print:
+    conn = temp_db
+    ijson_module = secondmind.core.ijson if use_ijson else None
+    if use_ijson and ijson_module is None:
+        pytest.skip("ijson is not installed")
+
+    monkeypatch.chdir(tmp_path)
+
+    with patch("secondmind.core.get_connection", return_value=conn), patch(
+        "secondmind.core.ijson", ijson_module
+    ), patch(
+        "secondmind.core.IMPORT_BATCH_SIZE", 120
+    ), patch(
+        "secondmind.core.console.print"
+    ) as mock_print:
+        import_json_to_db(user)
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM notes WHERE user = ?", (user,))
+        assert cursor.fetchone()[0] == 250
+        cursor.execute("SELECT COUNT(*) FROM note_tags")
+        assert cursor.fetchone()[0] == 250
+        mock_print.assert_called_once_with(
+            f"[green]Imported 250 notes from {user}_notes_export.json into DB.[/green]"
+        )
+
+
+@pytest.mark.parametrize("use_ijson", [True, False])
+def test_import_json_to_db_invalid_json(tmp_path, temp_db, monkeypatch, use_ijson):
+    user = "testuser"
+    filename = tmp_path / f"{user}_notes_export.json"
+    # Valid notes followed by garbage, so a streaming parser fails midway
+    filename.write_text('[{"note": "Note 1", "tags": [], "due_date": null}, oops')
+
+    conn = temp_db
+    ijson_module = secondmind.core.ijson if use_ijson else None
+    if use_ijson and ijson_module is None:
+        pytest.skip("ijson is not installed")
+
+    monkeypatch.chdir(tmp_path)
+
+    with patch("secondmind.core.get_connection", return_value=conn), patch(
+        "secondmind.core.ijson", ijson_module
+    ), patch(
+        "secondmind.core.console.print"
+    ) as mock_print:
         import_json_to_db(user)
 
         mock_print.assert_called_once_with("[red]Invalid JSON format.[/red]")
 
+        # Nothing from the partially parsed file is kept
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM notes")
+        assert cursor.fetchone()[0] == 0
+
 
 def test_search_notes_by_keyword_found():
     user = "testuser"
@@ -544,11 +988,12 @@ def test_search_notes_by_keyword_found():
         search_notes_by_keyword(user, keyword)
 
         expected_query = (
-            "SELECT id, note, tags, due_date FROM notes "
-            "WHERE user = ? AND LOWER(note) LIKE LOWER(?)"
+            "SELECT n.id, n.note, n.tags, n.due_date FROM notes_fts "
+            "CROSS JOIN notes n ON n.id = notes_fts.rowid "
+            "WHERE notes_fts.note LIKE ? AND n.user = ? ORDER BY n.id"
         )
-        expected_params = (user, f"%{keyword.lower()}%")
-        # Assert query was executed with correct LIKE clause
+        expected_params = (f"%{keyword}%", user)
+        # Assert query was executed against the full-text index
         mock_cursor.execute.assert_called_once_with(
             expected_query, expected_params
         )
@@ -558,6 +1003,83 @@ def test_search_notes_by_keyword_found():
         mock_print.assert_not_called()
 
 
+def test_search_notes_by_keyword_uses_fts(temp_db):
+    user = "testuser"
+    conn = temp_db
+
+    with patch("secondmind.core.get_connection", return_value=conn):
+        add_note_to_db(user, "Finish PROJECT report", ["#work"], None)
+        add_note_to_db(user, "Buy milk", [], None)
+        add_note_to_db("otheruser", "Another project", [], None)
+
+        # Edited and deleted notes must be reflected in the index
+        conn.execute("UPDATE notes SET note = 'Buy pro' WHERE note = 'Buy milk'")
+        conn.execute("DELETE FROM notes WHERE note = ?", ("Finish PROJECT report",))
+        add_note_to_db(user, "Project kickoff", [], "2025-08-01")
+        conn.commit()
+
+        with patch("secondmind.core.render_notes_table") as mock_render:
+            search_notes_by_keyword(user, "pro")
+
+        rows = mock_render.call_args[0][0]
+        assert [row[1] for row in rows] == ["Buy pro", "Project kickoff"]
+
+
+def test_search_notes_by_keyword_query_plan(temp_db):
+    # Capture the SQL search_notes_by_keyword sends, then ask SQLite to plan it
+    mock_conn = MagicMock()
+    mock_conn.__enter__.return_value = mock_conn
+    mock_cursor = mock_conn.cursor.return_value
+    mock_cursor.fetchall.return_value = []
+
+    with patch("secondmind.core.get_connection", return_value=mock_conn), patch(
+        "secondmind.core.console.print"
+    ):
+        search_notes_by_keyword("testuser", "pro")
+
+    query, params = mock_cursor.execute.call_args[0]
+    conn = temp_db
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+
+    # Plan rows are listed outermost loop first; the wording around the table
+    # names differs between SQLite versions, so only match the names
+    fts_step = next(i for i, detail in enumerate(plan) if "notes_fts" in detail)
+    notes_step = next(
+        i for i, detail in enumerate(plan) if re.search(r"\bn\b|\bnotes\b", detail)
+    )
+    assert fts_step < notes_step
+    assert "rowid" in plan[notes_step]
+
+    # FTS5 encodes its constraints in idxStr: "L" is the trigram LIKE, while a
+    # "=" would mean the index is probed per note row instead of scanned once
+    idx_str = re.search(r"INDEX \d+:(\S*)", plan[fts_step]).group(1)
+    assert "L" in idx_str
+    assert "=" not in idx_str
+
+
+def test_search_notes_by_keyword_without_fts():
+    user = "testuser"
+    # A private database, so dropping the index does not leak into other tests
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    conn.execute("DROP TABLE notes_fts")
+    conn.executescript(
+        "DROP TRIGGER notes_fts_insert;"
+        "DROP TRIGGER notes_fts_delete;"
+        "DROP TRIGGER notes_fts_update;"
+    )
+
+    with patch("secondmind.core.get_connection", return_value=conn):
+        add_note_to_db(user, "Finish project report", [], None)
+
+        with patch("secondmind.core.render_notes_table") as mock_render:
+            search_notes_by_keyword(user, "PROJECT")
+
+        mock_render.assert_called_once_with(
+            [(1, "Finish project report", None, None)]
+        )
+
+
 def test_search_notes_by_keyword_not_found():
     user = "testuser"
     keyword = "unicorns"
@@ -590,13 +1112,18 @@ def test_filter_notes_by_tag_found(temp_db, monkeypatch):
     user = "testuser"
     tag = "test"
 
-    conn = get_test_db_conn(temp_db)
+    conn = temp_db
 
     with patch("secondmind.core.get_connection", return_value=conn):
         # Add some note with different tags
-        add_note_to_db(user, "Note 1", ["#test", "#urgent"], "2025-08-01")
-        add_note_to_db(user, "Note 2", ["#work", "#test"], "2025-09-01")
-        add_note_to_db(user, "Note 3", ["#test"], "2025-10-01")
+        seed_notes(
+            conn,
+            [
+                (user, "Note 1", "#test,#urgent", "2025-08-01"),
+                (user, "Note 2", "#work,#test", "2025-09-01"),
+                (user, "Note 3", "#test", "2025-10-01"),
+            ],
+        )
 
         # Mock reneder_notes_table to check if it's called
         with patch("secondmind.core.render_notes_table") as mock_render:
@@ -611,13 +1138,18 @@ def test_filter_notes_by_tag_not_found(temp_db, monkeypatch):
     user = "testuser"
     tag = "unicorn"
 
-    conn = get_test_db_conn(temp_db)
+    conn = temp_db
 
     with patch("secondmind.core.get_connection", return_value=conn):
 
         # Add some notes with different tags
-        add_note_to_db(user, "Note 1", ["#test", "#urgent"], "2025-08-01")
-        add_note_to_db(user, "Note 2", ["#work"], "2025-09-01")
+        seed_notes(
+            conn,
+            [
+                (user, "Note 1", "#test,#urgent", "2025-08-01"),
+                (user, "Note 2", "#work", "2025-09-01"),
+            ],
+        )
 
         # Mock console.print to check if the "No notes found" message is printed
         with patch("secondmind.core.console.print") as mock_print:
@@ -630,75 +1162,158 @@ def test_filter_notes_by_tag_not_found(temp_db, monkeypatch):
             )
 
 
-def test_view_notes_today(temp_db, monkeypatch):
+def test_filter_notes_by_tag_exact_match(temp_db):
     user = "testuser"
-    today = datetime.today().date()
 
-    conn = get_test_db_conn(temp_db)
+    conn = temp_db
 
     with patch("secondmind.core.get_connection", return_value=conn):
-        add_note_to_db(user, "Note 1", ["#test"], str(today))
-        add_note_to_db(user, "Note 2", ["#test"], "2025-08-01")
-        add_note_to_db(user, "Note 3", ["#test"], "2025-07-01")
+        seed_notes(
+            conn,
+            [
+                (user, "Note 1", "#Test", "2025-08-01"),
+                (user, "Note 2", "#testing", "2025-09-01"),
+                ("otheruser", "Note 3", "#test", None),
+            ],
+        )
 
-        # Mock render_notes_table to check if it's called
         with patch("secondmind.core.render_notes_table") as mock_render:
-            view_due_notes(user, mode="today")
+            filter_notes_by_tag(user, "test")
 
-            # The table render function should be called
-            # with results for notes due today
-            mock_render.assert_called_once()
+        # "#testing" is not a match, and tags compare case-insensitively
+        rows = mock_render.call_args[0][0]
+        assert [row[1] for row in rows] == ["Note 1"]
 
 
-def test_view_due_notes_overdue(temp_db, monkeypatch):
+def test_note_tags_follow_edits_and_deletes(temp_db):
     user = "testuser"
-    today = datetime.today().date()
 
-    conn = get_test_db_conn(temp_db)
+    conn = temp_db
 
     with patch("secondmind.core.get_connection", return_value=conn):
-        add_note_to_db(user, "Note 1", ["#test"], str(today))
-        add_note_to_db(user, "Note 2", ["#test"], "2025-08-01")
-        add_note_to_db(user, "Note 3", ["#test"], "2025-07-01")
+        add_note_to_db(user, "Note 1", ["#old"], None)
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM notes WHERE note = ?", ("Note 1",))
+        note_id = cursor.fetchone()[0]
 
-        # Mock render_notes_table to check if it's called
-        with patch("secondmind.core.render_notes_table") as mock_render:
-            view_due_notes(user, mode="overdue")
+        with patch("builtins.input", side_effect=["", "new, other", ""]), patch(
+            "secondmind.core.console.print"
+        ):
+            edit_note_by_id(user, note_id)
 
-            # The table render function should be called with results for overdue notes
-            mock_render.assert_called_once()
+        cursor.execute("SELECT tag FROM note_tags WHERE note_id = ?", (note_id,))
+        assert sorted(row[0] for row in cursor.fetchall()) == ["new", "other"]
+
+        with patch("secondmind.core.console.print"):
+            delete_note_by_id(user, note_id)
+
+        cursor.execute("SELECT COUNT(*) FROM note_tags")
+        assert cursor.fetchone()[0] == 0
 
 
-def test_view_due_notes_week(temp_db, monkeypatch):
+@pytest.mark.parametrize(
+    "tags, expected",
+    [
+        ("#work,#urgent", ["work", "urgent"]),
+        ("#updated #tags", ["updated", "tags"]),
+        ("#test, #edit", ["test", "edit"]),
+        ("", []),
+        (None, []),
+    ],
+)
+def test_split_tag_string(tags, expected):
+    assert split_tag_string(tags) == expected
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("todo,idea", ["#todo", "#idea"]),
+        (" #todo , idea ,", ["#todo", "#idea"]),
+        ("#", []),
+        ("", []),
+    ],
+)
+def test_parse_tag_input(raw, expected):
+    assert parse_tag_input(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "mode, expected",
+    [
+        ("today", ["Note 1"]),
+        ("overdue", ["Note 3"]),
+        ("week", ["Note 1", "Note 2"]),
+    ],
+)
+def test_view_due_notes(temp_db, mode, expected):
     user = "testuser"
-    today = datetime.today().date()
-    week_later = today + timedelta(days=7)
 
-    conn = get_test_db_conn(temp_db)
+    conn = temp_db
 
     with patch("secondmind.core.get_connection", return_value=conn):
-        add_note_to_db(user, "Note 1", ["#test"], str(today))
-        add_note_to_db(user, "Note 2", ["#test"], str(week_later))
-        add_note_to_db(user, "Note 3", ["#test"], "2025-07-01")
+        seed_notes(
+            conn,
+            [
+                (user, "Note 1", "#test", _TODAY_STR),
+                (user, "Note 2", "#test", _WEEK_LATER_STR),
+                (user, "Note 3", "#test", "2025-07-01"),
+            ],
+        )
 
-        # Mock render_notes_teble to check id it's called
+        # Mock render_notes_table to check which notes it's called with
         with patch("secondmind.core.render_notes_table") as mock_render:
-            view_due_notes(user, mode="week")
+            view_due_notes(user, mode=mode)
 
-            # The table render function should be called
-            # with results for notes due this week
             mock_render.assert_called_once()
+            rows = mock_render.call_args[0][0]
+            assert [row[1] for row in rows] == expected
+
+
+@pytest.mark.parametrize(
+    "due_date, expected",
+    [
+        ("2025-07-05", "2025-07-05"),
+        ("2025-7-5", "2025-07-05"),
+        ("2025/07/01", "2025/07/01"),
+        ("someday", "someday"),
+        (None, None),
+    ],
+)
+def test_normalize_due_date(due_date, expected):
+    assert normalize_due_date(due_date) == expected
+
+
+@pytest.mark.parametrize("due_date", ["2025/07/01", "2025-13-45", "2025-02-30"])
+def test_view_due_notes_ignores_malformed_dates(temp_db, due_date):
+    user = "testuser"
+
+    conn = temp_db
+
+    with patch("secondmind.core.get_connection", return_value=conn):
+        seed_notes(conn, [(user, "Note 1", "#test", due_date)])
+
+        with patch("secondmind.core.console.print") as mock_print:
+            view_due_notes(user, mode="overdue")
+            mock_print.assert_called_once_with(
+                "[red]No notes found for: OVERDUE[/red]"
+            )
 
 
 def test_view_due_notes_no_matching(temp_db, monkeypatch):
     user = "testuser"
 
-    conn = get_test_db_conn(temp_db)
+    conn = temp_db
 
     with patch("secondmind.core.get_connection", return_value=conn):
         # Add notes with due dates far in the future or past
-        add_note_to_db(user, "Note 1", ["#test"], "2025-08-01")
-        add_note_to_db(user, "Note 2", ["#test"], "2025-07-01")
+        seed_notes(
+            conn,
+            [
+                (user, "Note 1", "#test", "2025-08-01"),
+                (user, "Note 2", "#test", "2025-07-01"),
+            ],
+        )
 
         # Mock console.print to check if the "No notes found" message is printed
         with patch("secondmind.core.console.print") as mock_print:
@@ -715,22 +1330,18 @@ def test_edit_note_by_id(temp_db):
     original_tags = "#test, #edit"
     original_due = "2025-08-01"
 
-    conn = get_test_db_conn(temp_db)
+    conn = temp_db
 
     with patch("secondmind.core.get_connection", return_value=conn):
-        add_note_to_db(user, original_note, original_tags.split(","), original_due)
-
-        # Fetch the inserted note's ID
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id FROM notes WHERE user = ? AND note = ?", (user, original_note)
+        [note_id] = seed_notes(
+            conn, [(user, original_note, original_tags, original_due)]
         )
-        note_id = cursor.fetchone()[0]
+        cursor = conn.cursor()
 
         # Mock iser input for the new note
         new_note = "Updated note text"
         new_tags = "#updated #tags"
-        new_due = "2025-09-01"
+        new_due = "2025-9-1"
 
         # Patch input() calls to stimulate the user entering new values
         with patch("builtins.input", side_effect=[new_note, new_tags, new_due]):
@@ -749,7 +1360,7 @@ def test_edit_note_by_id(temp_db):
 
                 assert updated_note == new_note
                 assert updated_tags == new_tags
-                assert updated_due == new_due
+                assert updated_due == "2025-09-01"
 
                 # Check if the console print was called with success message
                 mock_print.assert_called_with(
@@ -757,13 +1368,43 @@ def test_edit_note_by_id(temp_db):
                 )
 
 
+def test_edit_note_by_id_duplicate(temp_db):
+    """Test editing a note into an exact copy of another note."""
+
+    user = "testuser"
+    conn = temp_db
+
+    with patch("secondmind.core.get_connection", return_value=conn):
+        _, note_id = seed_notes(
+            conn,
+            [
+                (user, "First note", "#test", "2025-08-01"),
+                (user, "Second note", "#test", "2025-08-01"),
+            ],
+        )
+        cursor = conn.cursor()
+
+        with patch("builtins.input", side_effect=["First note", "", ""]), patch(
+            "secondmind.core.console.print"
+        ) as mock_print:
+            edit_note_by_id(user, note_id)
+
+        # The second note is left untouched
+        cursor.execute("SELECT note FROM notes WHERE id = ?", (note_id,))
+        assert cursor.fetchone()[0] == "Second note"
+        mock_print.assert_called_with(
+            "[yellow]Another note already has the same content, tags, and "
+            "due date. Nothing changed.[/yellow]"
+        )
+
+
 def test_edit_note_not_found(temp_db):
     """Test case where note is not found for editing."""
 
     user = "testuser"
     non_existing_note_id = 9999  # This ID doesn't exist in the database
 
-    conn = get_test_db_conn(temp_db)
+    conn = temp_db
 
     # Patch console.print to capture output
     with patch("secondmind.core.console.print") as mock_print:
@@ -775,52 +1416,86 @@ def test_edit_note_not_found(temp_db):
         mock_print.assert_called_with("[red]Note not found.[/red]")
 
 
-@patch("secondmind.core.console.print")
-@patch("secondmind.core.get_connection")
-def test_show_due_alerts_from_db_summary(mock_get_conn, mock_print):
-    mock_conn = MagicMock()
-    mock_cursor = mock_conn.cursor.return_value
-    mock_cursor.fetchall.return_value = [
-        ("2025-07-01",),  # overdue
-        (datetime.today().strftime("%Y-%m-%d"),),  # Today
-    ]
-
-    mock_get_conn.return_value.__enter__.return_value = mock_conn
+def test_show_due_alerts_from_db_summary(temp_db):
+    conn = temp_db
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO notes (user, note, tags, due_date) VALUES (?, ?, ?, ?)",
+        [
+            ("testuser", "Note 1", None, "2025-07-01"),  # overdue
+            ("testuser", "Note 2", None, _TODAY_STR),
+            ("testuser", "Note 3", None, "2025/07/01"),  # malformed, ignored
+            ("testuser", "Note 5", None, "2025-02-30"),  # impossible, ignored
+            ("otheruser", "Note 4", None, "2025-07-01"),  # another user
+        ],
+    )
+    conn.commit()
 
-    with patch("secondmind.core.user", "testuser"):
+    with patch("secondmind.core.get_connection", return_value=conn), patch(
+        "secondmind.core.user", "testuser"
+    ), patch("secondmind.core.console.print") as mock_print:
         show_due_alerts_from_db()
 
-    # Extract the printed Panel
+    # The Panel holds the markup string it was built from; compare it as is
     actual_panel = mock_print.call_args[0][0]
-    content = str(actual_panel.renderable)
 
-    assert "1 overdue" in content
-    assert "1 due_today" in content
+    assert actual_panel.renderable == (
+        "[bold red]1 overdue[/bold red] | [bold yellow]1 due_today[/bold yellow]"
+    )
+
 
+def test_show_due_alerts_from_db_only_malformed_dates(temp_db):
+    conn = temp_db
+    seed_notes(conn, [("testuser", "Note 1", None, "someday")])
+
+    with patch("secondmind.core.get_connection", return_value=conn), patch(
+        "secondmind.core.user", "testuser"
+    ), patch("secondmind.core.console.print") as mock_print:
+        show_due_alerts_from_db()
+
+    # The user has notes with due dates, just none that can be counted
+    mock_print.assert_called_once_with(
+        "[green]No due tasks today. All clear [/green]"
+    )
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_export_notes_to_json(use_orjson):
+    orjson_module = secondmind.core.orjson if use_orjson else None
+    if use_orjson and orjson_module is None:
+        pytest.skip("orjson is not installed")
 
-@patch("secondmind.core.console.print")
-@patch("secondmind.core.open", new_callable=mock_open)
-@patch("secondmind.core.get_connection")
-def test_export_notes_to_json(mock_get_conn, mock_file, mock_print):
     # Arrange
     mock_conn = MagicMock()
     mock_cursor = mock_conn.cursor.return_value
-    mock_cursor.fetchall.return_value = [
-        ("Test note 1", "tag1,tag2", "2025-08-01"),
-        ("Test note 2", "", None),
-    ]
+    mock_cursor.__iter__.return_value = iter(
+        [
+            ("Test note 1", "tag1,tag2", "2025-08-01"),
+            ("Test note 2", "", None),
+        ]
+    )
 
-    mock_get_conn.return_value.__enter__.return_value = mock_conn
+    mock_conn.__enter__.return_value = mock_conn
+
+    # Collect everything written to the export file in one buffer
+    buffer = io.BytesIO() if use_orjson else io.StringIO()
+    mock_file = mock_open()
+    mock_file.return_value.write.side_effect = buffer.write
 
     # Act
-    export_notes_to_json("testuser")
+    with ExitStack() as stack:
+        stack.enter_context(patch("secondmind.core.orjson", orjson_module))
+        stack.enter_context(
+            patch("secondmind.core.get_connection", return_value=mock_conn)
+        )
+        stack.enter_context(patch("secondmind.core.open", mock_file))
+        mock_print = stack.enter_context(patch("secondmind.core.console.print"))
+        export_notes_to_json("testuser")
 
     # Assert file writing
-    mock_file.assert_called_once_with("testuser_notes_export.json", "w")
-    handle = mock_file()
-    written_data = json.loads(
-        "".join(call.args[0] for call in handle.write.call_args_list)
-    )
+    mode = "wb" if use_orjson else "w"
+    mock_file.assert_called_once_with("testuser_notes_export.json", mode)
+    written_data = json.loads(buffer.getvalue())
 
     expected = [
         {"note": "Test note 1", "tags": ["tag1", "tag2"], "due_date": "2025-08-01"},
@@ -833,44 +1508,3 @@ def test_export_notes_to_json(mock_get_conn, mock_file, mock_print):
     mock_print.assert_called_once_with(
         "[green]Notes exported to testuser_notes_export.json[/green]"
     )
-
-
-@patch("secondmind.core.get_connection")
-def test_db_note_exists_true(mock_get_conn):
-    # Arrange
-    mock_conn = MagicMock()
-    mock_cursor = mock_conn.cursor.return_value
-    mock_cursor.fetchone.return_value = (1,)
-
-    # Stimulate row found
-    mock_get_conn.return_value = mock_conn
-
-    # Act
-    exists = db_note_exists("testuser", 1)
-
-    # Assert
-    assert exists is True
-
-    mock_cursor.execute.assert_called_once_with(
-        "SELECT 1 FROM notes WHERE id = ? AND user = ?", (1, "testuser")
-    )
-
-
-@patch("secondmind.core.get_connection")
-def test_db_note_exists_false(mock_get_conn):
-    # Arrange
-    mock_conn = MagicMock()
-    mock_cursor = mock_conn.cursor.return_value
-    mock_cursor.fetchone.return_value = None
-
-    mock_get_conn.return_value = mock_conn
-
-    # Act
-    exists = db_note_exists("testuser", 999)
-
-    # Assert
-    assert exists is False
-
-    mock_cursor.execute.assert_called_once_with(
-        "SELECT 1 FROM notes WHERE id = ? AND user = ?", (999, "testuser")
-    )